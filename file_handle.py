@@ -1,22 +1,119 @@
+import os
+import sys
+import queue
+import atexit
+import mmap
+import stat
 import shutil
 import logging
+import logging.handlers
 import pathlib
 import errno
+import time
+
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, List, Optional, Sequence, Tuple, Union
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+try:
+    import liburing
+except ImportError:
+    liburing = None
+
+try:
+    from . import file_handle_c as _c
+except ImportError:
+    try:
+        import file_handle_c as _c
+    except ImportError:
+        _c = None
+
+_ENOTEMPTY = errno.ENOTEMPTY
+_COPY_RANGE_UNSUPPORTED = (errno.ENOSYS, errno.EXDEV, errno.EINVAL)
+_SENDFILE_UNSUPPORTED = (errno.ENOSYS, errno.EINVAL, errno.ENOTSOCK)
+
+# Records are only queued on the calling thread; a listener thread writes them to disk.
+_log_file_handler = logging.FileHandler("file_handle.log", delay=True)
+_log_file_handler.setFormatter(logging.Formatter("%(asctime)s:%(name)s:%(message)s"))
+_log_queue = queue.SimpleQueue()
+_log_listener = logging.handlers.QueueListener(_log_queue, _log_file_handler)
+_log_listener.start()
+atexit.register(_log_listener.stop)
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+logger.propagate = False
+logger.addHandler(logging.handlers.QueueHandler(_log_queue))
+_log_err = logger.error
+_fspath = os.fspath
+_O_NONBLOCK = getattr(os, "O_NONBLOCK", 0)
+
+PathLike = Union[str, os.PathLike]
+
+# Paths recently found missing, mapped to the monotonic time their entry expires.
+_NEG_CACHE: "OrderedDict[str, float]" = OrderedDict()
+_NEG_CACHE_SIZE = 64
+_NEG_CACHE_TTL = 0.5
+
+
+def _known_missing(path: str) -> bool:
+    """
+    Check whether a path was found missing within the last _NEG_CACHE_TTL seconds.
+
+    Args:
+        path: The path to look up.
+
+    Returns:
+        True if the path is cached as missing, False otherwise.
+    """
+    expires = _NEG_CACHE.get(path)
+    if expires is None:
+        return False
+    if expires > time.monotonic():
+        return True
+    _NEG_CACHE.pop(path, None)
+    return False
+
+
+def _remember_missing(path: str) -> None:
+    """
+    Cache a path as missing, evicting the oldest entry once the cache is full.
+
+    Args:
+        path: The path that does not exist.
+    """
+    # Re-inserting moves the key to the end without a separate move_to_end, which
+    # could raise KeyError if another thread popped the key in between.
+    _NEG_CACHE.pop(path, None)
+    _NEG_CACHE[path] = time.monotonic() + _NEG_CACHE_TTL
+    while len(_NEG_CACHE) > _NEG_CACHE_SIZE:
+        try:
+            _NEG_CACHE.popitem(last=False)
+        except KeyError:
+            break
+
 
-from typing import Callable, Optional
+class _PathNotValidError(Exception):
+    def __init__(self, path: Optional[PathLike] = None) -> None:
+        super().__init__(path)
+        self.path = path
 
-logging.basicConfig(
-    filename="file_handle.log",
-    level=logging.INFO,
-    format="%(asctime)s:%(name)s:%(message)s",
-)
+    def __str__(self) -> str:
+        if self.path is None:
+            return ""
+        return f"{self.path} does not exist."
 
 
-class SourceNotValidError(Exception):
+class SourceNotValidError(_PathNotValidError):
     ...
 
 
-class DestinationNotValidError(Exception):
+class DestinationNotValidError(_PathNotValidError):
     ...
 
 
@@ -28,9 +125,512 @@ class ReadOnlyError(Exception):
     ...
 
 
+_ERRNO_EXC = {errno.EACCES: PermissionDeniedError, errno.EROFS: ReadOnlyError}
+
+
+_URING_CHUNK = 1 << 17
+_URING_BATCH = 32
+_COPY_RANGE_CHUNK = 1 << 30
+_UPLOAD_STEPS = 6
+_UPLOAD_MANY_MAX = 1 << 17
+_DIRECT_THRESHOLD = 32 << 20
+_DIRECT_CHUNK = 4 << 20
+_DIRECT_ALIGN = 4096
+
+# Parallel unlink is slower than serial unlink on macOS, so it is never used there.
+PARALLEL_REMOVE_SUPPORTED = sys.platform != "darwin"
+_REMOVE_WORKERS = (os.cpu_count() or 1) * 4
+
+
+def _reap_completions(ring, cqe, count: int) -> List[Tuple[int, Union[int, OSError]]]:
+    """
+    Wait for count completions on an io_uring and mark them as seen.
+
+    Args:
+        ring: The ring the requests were submitted to.
+        cqe: The completion queue entry buffer to read completions through.
+        count: The number of completions to wait for.
+
+    Returns:
+        The user data of every completion with its result, or the OSError it failed with.
+    """
+    completions = []
+    while len(completions) < count:
+        liburing.io_uring_wait_cqe(ring, cqe)
+        ready = liburing.io_uring_cq_ready(ring)
+        for i in range(ready):
+            entry = cqe[i]
+            try:
+                result = entry.res
+            except OSError as error:
+                result = error
+            completions.append((entry.user_data, result))
+        liburing.io_uring_cq_advance(ring, ready)
+    return completions
+
+
+def _copy_uring(src_fd: int, dst_fd: int, size: int) -> bool:
+    """
+    Copy size bytes between two open file descriptors through io_uring.
+
+    Every chunk is queued as a read linked to its write, and up to _URING_BATCH
+    pairs are handed to the kernel with a single submit.
+
+    Args:
+        src_fd: The file descriptor to read from.
+        dst_fd: The file descriptor to write to.
+        size: The number of bytes to copy.
+
+    Returns:
+        True if the data was copied, False if io_uring is not available.
+    """
+    if liburing is None:
+        return False
+    ring = liburing.Ring()
+    try:
+        liburing.io_uring_queue_init(_URING_BATCH * 2, ring, 0)
+    except OSError:
+        return False
+    try:
+        files = liburing.FileIndex([src_fd, dst_fd])
+        liburing.io_uring_register_files(ring, files)
+        cqe = liburing.Cqe()
+        buffers = [bytearray(_URING_CHUNK) for _ in range(_URING_BATCH)]
+        # The kernel fills these buffers after submit, so each one has to stay
+        # referenced until its completion has been reaped.
+        tail = bytearray(size % _URING_CHUNK)
+        offset = 0
+        while offset < size:
+            pending = 0
+            for buffer in buffers:
+                if offset >= size:
+                    break
+                length = min(_URING_CHUNK, size - offset)
+                if length != _URING_CHUNK:
+                    buffer = tail
+                sqe = liburing.io_uring_get_sqe(ring)
+                liburing.io_uring_prep_read(sqe, 0, buffer, offset)
+                liburing.io_uring_sqe_set_flags(
+                    sqe, liburing.IOSQE_IO_LINK | liburing.IOSQE_FIXED_FILE
+                )
+                liburing.io_uring_sqe_set_data64(sqe, length)
+                sqe = liburing.io_uring_get_sqe(ring)
+                liburing.io_uring_prep_write(sqe, 1, buffer, offset)
+                liburing.io_uring_sqe_set_flags(sqe, liburing.IOSQE_FIXED_FILE)
+                liburing.io_uring_sqe_set_data64(sqe, length)
+                offset += length
+                pending += 2
+            liburing.io_uring_submit(ring)
+            for length, result in _reap_completions(ring, cqe, pending):
+                if isinstance(result, OSError):
+                    raise result
+                if result != length:
+                    raise OSError(errno.EIO, "Short transfer during copy")
+        liburing.io_uring_unregister_files(ring)
+        return True
+    finally:
+        liburing.io_uring_queue_exit(ring)
+
+
+def _copy_file_range(src_fd: int, dst_fd: int) -> bool:
+    """
+    Copy the remaining data between two open file descriptors inside the kernel.
+
+    Args:
+        src_fd: The file descriptor to read from.
+        dst_fd: The file descriptor to write to.
+
+    Returns:
+        True if the data was copied, False if copy_file_range is not available.
+    """
+    if not hasattr(os, "copy_file_range"):
+        return False
+    copied = 0
+    try:
+        while True:
+            length = os.copy_file_range(src_fd, dst_fd, _COPY_RANGE_CHUNK)
+            if not length:
+                break
+            copied += length
+    except OSError as error:
+        if copied == 0 and error.errno in _COPY_RANGE_UNSUPPORTED:
+            return False
+        raise
+    return True
+
+
+def _sendfile(src_fd: int, dst_fd: int, size: int) -> bool:
+    """
+    Copy size bytes between two open file descriptors with sendfile.
+
+    Args:
+        src_fd: The file descriptor to read from.
+        dst_fd: The file descriptor to write to.
+        size: The number of bytes to copy.
+
+    Returns:
+        True if the data was copied, False if sendfile can't write to a regular file here.
+    """
+    if not hasattr(os, "sendfile"):
+        return False
+    offset = 0
+    try:
+        while offset < size:
+            sent = os.sendfile(
+                dst_fd, src_fd, offset, min(_COPY_RANGE_CHUNK, size - offset)
+            )
+            if not sent:
+                break
+            offset += sent
+    except OSError as error:
+        if offset == 0 and error.errno in _SENDFILE_UNSUPPORTED:
+            return False
+        raise
+    return True
+
+
+def _copy_direct(src_fd: int, dst_fd: int, size: int) -> bool:
+    """
+    Copy size bytes between two open file descriptors with O_DIRECT, bypassing the page cache.
+
+    Args:
+        src_fd: The file descriptor to read from.
+        dst_fd: The file descriptor to write to.
+        size: The number of bytes to copy.
+
+    Returns:
+        True if the data was copied, False if the filesystem doesn't support O_DIRECT.
+    """
+    if fcntl is None or not hasattr(os, "O_DIRECT"):
+        return False
+    src_flags = fcntl.fcntl(src_fd, fcntl.F_GETFL)
+    dst_flags = fcntl.fcntl(dst_fd, fcntl.F_GETFL)
+    try:
+        fcntl.fcntl(src_fd, fcntl.F_SETFL, src_flags | os.O_DIRECT)
+        fcntl.fcntl(dst_fd, fcntl.F_SETFL, dst_flags | os.O_DIRECT)
+    except OSError as error:
+        fcntl.fcntl(src_fd, fcntl.F_SETFL, src_flags)
+        if error.errno == errno.EINVAL:
+            return False
+        raise
+    try:
+        # Anonymous mappings are page aligned, as O_DIRECT requires.
+        with mmap.mmap(-1, _DIRECT_CHUNK) as buffer, memoryview(buffer) as view:
+            offset = 0
+            direct = True
+            while offset < size:
+                length = os.preadv(src_fd, [buffer], offset)
+                if not length:
+                    break
+                if direct and length < _DIRECT_CHUNK and offset + length < size:
+                    # A short read before the end leaves offset unaligned, which O_DIRECT
+                    # can't continue from, so the rest goes through the page cache.
+                    fcntl.fcntl(src_fd, fcntl.F_SETFL, src_flags)
+                    fcntl.fcntl(dst_fd, fcntl.F_SETFL, dst_flags)
+                    direct = False
+                if direct:
+                    # The last block is written in full and cut back by ftruncate below.
+                    aligned = -(-length // _DIRECT_ALIGN) * _DIRECT_ALIGN
+                    os.pwritev(dst_fd, [view[:aligned]], offset)
+                else:
+                    written = 0
+                    while written < length:
+                        written += os.pwritev(
+                            dst_fd, [view[written:length]], offset + written
+                        )
+                offset += length
+        os.ftruncate(dst_fd, offset)
+    finally:
+        fcntl.fcntl(src_fd, fcntl.F_SETFL, src_flags)
+        fcntl.fcntl(dst_fd, fcntl.F_SETFL, dst_flags)
+    return True
+
+
+def _copy_fast(source: str, destination: str, preserve_metadata: bool) -> bool:
+    """
+    Copy a regular file without shutil.
+
+    Args:
+        source: The path to the source file.
+        destination: The path to the destination file.
+        preserve_metadata: Also copy the permission bits and timestamps of the source.
+
+    Returns:
+        True if the file was copied, False if the caller should fall back to shutil.
+    """
+    # O_NONBLOCK keeps opening a FIFO from blocking before it is turned away below.
+    src_fd = os.open(source, os.O_RDONLY | _O_NONBLOCK)
+    try:
+        src_stat = os.fstat(src_fd)
+        if not stat.S_ISREG(src_stat.st_mode):
+            return False
+        if _O_NONBLOCK:
+            os.set_blocking(src_fd, True)
+        # Truncate only once the destination is known not to be the source itself,
+        # and leave FIFOs and devices to shutil, which turns FIFOs away.
+        try:
+            dst_fd = os.open(destination, os.O_WRONLY | os.O_CREAT | _O_NONBLOCK, 0o666)
+        except OSError as error:
+            # A FIFO without a reader.
+            if error.errno == errno.ENXIO:
+                return False
+            raise
+        try:
+            dst_stat = os.fstat(dst_fd)
+            if not stat.S_ISREG(dst_stat.st_mode):
+                return False
+            if os.path.samestat(src_stat, dst_stat):
+                raise shutil.SameFileError(
+                    f"{source!r} and {destination!r} are the same file"
+                )
+            if _O_NONBLOCK:
+                os.set_blocking(dst_fd, True)
+            os.ftruncate(dst_fd, 0)
+            copied = False
+            if src_stat.st_size > _DIRECT_THRESHOLD:
+                copied = _copy_direct(src_fd, dst_fd, src_stat.st_size)
+            if not copied:
+                copied = _copy_uring(src_fd, dst_fd, src_stat.st_size)
+            if not copied:
+                copied = _copy_file_range(src_fd, dst_fd)
+            if not copied:
+                copied = _sendfile(src_fd, dst_fd, src_stat.st_size)
+        finally:
+            os.close(dst_fd)
+    finally:
+        os.close(src_fd)
+    if copied and preserve_metadata:
+        os.utime(destination, ns=(src_stat.st_atime_ns, src_stat.st_mtime_ns))
+        os.chmod(destination, stat.S_IMODE(src_stat.st_mode))
+    return copied
+
+
+def _unlink(path: str) -> None:
+    """
+    Remove a file, ignoring files that are already gone.
+
+    Args:
+        path: The path to the file to remove.
+    """
+    try:
+        os.unlink(path)
+    except FileNotFoundError:
+        pass
+
+
+def _rmdir(path: str) -> None:
+    """
+    Remove an empty directory, or a symlink that os.walk reported as a directory.
+
+    Args:
+        path: The path to the directory to remove.
+    """
+    try:
+        os.rmdir(path)
+    except NotADirectoryError:
+        _unlink(path)
+    except FileNotFoundError:
+        pass
+
+
+def _walk_error(error: OSError) -> None:
+    """
+    Raise errors from os.walk, except for directories removed while walking.
+
+    Args:
+        error: The error os.walk ran into.
+    """
+    if not isinstance(error, FileNotFoundError):
+        raise error
+
+
+def _prepare_destination(destination: str) -> bool:
+    """
+    Create the destination directory of a transfer if it doesn't exist.
+
+    Args:
+        destination: The path to the destination file or directory.
+
+    Returns:
+        True if the destination is a directory, False if it is an existing file that will be overwritten.
+
+    Raises:
+        DestinationNotValidError: If the destination directory can't be created.
+    """
+    try:
+        os.makedirs(destination, exist_ok=True)
+    except FileExistsError:
+        return False
+    except OSError as error:
+        _log_err("%s - %s - %s", error.errno, error.strerror, error.filename)
+        raise DestinationNotValidError(destination) from error
+    _NEG_CACHE.pop(destination, None)
+    return True
+
+
+def _upload_many_uring(
+    jobs: Sequence[Tuple[str, str, os.stat_result]],
+    depth: int,
+    preserve_metadata: bool,
+) -> bool:
+    """
+    Copy small regular files with one io_uring submit per group of depth files.
+
+    Each file is copied by a linked chain of open, open, read, write, close, close
+    on direct descriptors, so the whole group costs a single io_uring_enter.
+
+    Args:
+        jobs: The source path, target file path and source stat result of every file.
+        depth: The number of files to submit at once.
+        preserve_metadata: Also copy the permission bits and timestamps of the sources.
+
+    Returns:
+        True if the files were copied, False if io_uring or direct descriptors are not available.
+
+    Raises:
+        SourceNotValidError: If a source file disappeared before it was opened.
+        OSError: If any other step of a copy failed.
+    """
+    if liburing is None:
+        return False
+    ring = liburing.Ring()
+    try:
+        liburing.io_uring_queue_init(depth * _UPLOAD_STEPS, ring, 0)
+    except OSError:
+        return False
+    try:
+        # Sparse registration needs Linux 5.19, direct open and close 5.15.
+        try:
+            liburing.io_uring_register_files_sparse(ring, depth * 2)
+        except OSError as error:
+            if error.errno in (errno.EINVAL, errno.ENOSYS):
+                return False
+            raise
+        cqe = liburing.Cqe()
+        for start in range(0, len(jobs), depth):
+            group = jobs[start : start + depth]
+            # The kernel fills these buffers after submit, so each one has to stay
+            # referenced until its completion has been reaped.
+            buffers = []
+            for slot, (source, target, src_stat) in enumerate(group):
+                buffer = bytearray(src_stat.st_size)
+                buffers.append(buffer)
+                src_index = slot * 2
+                dst_index = src_index + 1
+                sqes = [liburing.io_uring_get_sqe(ring) for _ in range(_UPLOAD_STEPS)]
+                liburing.io_uring_prep_open_direct(
+                    sqes[0], source, os.O_RDONLY, src_index
+                )
+                liburing.io_uring_prep_open_direct(
+                    sqes[1],
+                    target,
+                    os.O_WRONLY | os.O_CREAT | os.O_TRUNC,
+                    dst_index,
+                    0o666,
+                )
+                liburing.io_uring_prep_read(sqes[2], src_index, buffer, 0)
+                liburing.io_uring_prep_write(sqes[3], dst_index, buffer, 0)
+                liburing.io_uring_prep_close_direct(sqes[4], src_index)
+                liburing.io_uring_prep_close_direct(sqes[5], dst_index)
+                for step, sqe in enumerate(sqes):
+                    flags = liburing.IOSQE_FIXED_FILE if step in (2, 3) else 0
+                    if step < _UPLOAD_STEPS - 1:
+                        flags |= liburing.IOSQE_IO_LINK
+                    liburing.io_uring_sqe_set_flags(sqe, flags)
+                    liburing.io_uring_sqe_set_data64(sqe, slot * _UPLOAD_STEPS + step)
+            liburing.io_uring_submit(ring)
+
+            # A failed step cancels the rest of its chain, so only the first failure counts.
+            failures = {}
+            for user_data, result in _reap_completions(
+                ring, cqe, len(group) * _UPLOAD_STEPS
+            ):
+                slot, step = divmod(user_data, _UPLOAD_STEPS)
+                if isinstance(result, OSError):
+                    error = result
+                elif step in (2, 3) and result != group[slot][2].st_size:
+                    error = OSError(errno.EIO, "Short transfer during copy")
+                else:
+                    continue
+                if slot not in failures or step < failures[slot][0]:
+                    failures[slot] = (step, error)
+            for slot, (source, target, src_stat) in enumerate(group):
+                if slot in failures:
+                    step, error = failures[slot]
+                    if step == 0 and error.errno == errno.ENOENT:
+                        raise SourceNotValidError(source) from error
+                    error.filename = source if step in (0, 2) else target
+                    raise error
+                if preserve_metadata:
+                    os.utime(target, ns=(src_stat.st_atime_ns, src_stat.st_mtime_ns))
+                    os.chmod(target, stat.S_IMODE(src_stat.st_mode))
+                _NEG_CACHE.pop(target, None)
+        return True
+    finally:
+        liburing.io_uring_queue_exit(ring)
+
+
+def _make_transfer(name: str, default_copy: Callable) -> Callable:
+    """
+    Build FileHandle.upload or download as a single-frame transfer bound to default_copy.
+
+    The common case, copying with default_copy, is FileHandle.transfer inlined with
+    default_copy as a closure variable; any other copy_func goes through FileHandle.transfer.
+
+    Args:
+        name: The name of the FileHandle method the function becomes.
+        default_copy: The copy function used when the caller doesn't pass copy_func.
+
+    Returns:
+        The transfer function.
+    """
+
+    def transfer(
+        source: PathLike,
+        destination: PathLike,
+        copy_func: Optional[Callable] = None,
+        preserve_metadata: bool = False,
+    ) -> Optional[bool]:
+        """
+        Upload or download a file or directory from the source path to the destination path.
+
+        Args:
+            source: The path to the source file or directory.
+            destination: The path to the destination file or directory.
+            copy_func: The function to use for copying the file or directory, FileHandle.copy by default.
+            preserve_metadata: Also copy the permission bits and timestamps.
+
+        Returns:
+            True once the file or directory has been copied.
+
+        Raises:
+            SourceNotValidError: If the source path is not valid.
+            DestinationNotValidError: If the destination path is not valid and cannot be created.
+            OSError: If there is an error during the file or directory copy operation.
+        """
+        if copy_func is not None:
+            FileHandle.transfer(source, destination, copy_func, preserve_metadata)
+            return True
+        source = _fspath(source)
+        destination = _fspath(destination)
+        _prepare_destination(destination)
+        try:
+            default_copy(source, destination, preserve_metadata)
+        except FileNotFoundError as error:
+            if error.filename != source:
+                raise
+            _remember_missing(source)
+            raise SourceNotValidError(source) from error
+        return True
+
+    transfer.__name__ = name
+    transfer.__qualname__ = f"FileHandle.{name}"
+    return transfer
+
+
 class FileHandle:
     @staticmethod
-    def make_directory(path: pathlib.Path) -> Optional[bool]:
+    def make_directory(path: PathLike) -> Optional[bool]:
         """
         Create a directory at the specified path if it doesn't exist.
 
@@ -39,51 +639,79 @@ class FileHandle:
 
         Returns:
             True if the directory was created successfully or already exists, False otherwise.
+
+        Raises:
+            PermissionDeniedError: If the directory can't be created due to missing permissions.
+            ReadOnlyError: If the directory would be created on a read-only filesystem.
+            OSError: If there is any other error while creating the directory.
         """
         try:
-            path.mkdir(parents=True, exist_ok=True)
+            path = _fspath(path)
+            if _c is not None:
+                _c.make_directory(path)
+            else:
+                os.makedirs(path, exist_ok=True)
+            _NEG_CACHE.pop(path, None)
             return True
         except OSError as error:
-            if error.errno != errno.EACCES:
-                logging.error(f"{error.errno} - {error.strerror} - {error.filename}")
-                raise PermissionDeniedError(
-                    f"{error.errno} - {error.strerror} - {error.filename}"
-                )
-            elif error.errno == errno.EROFS:
-                logging.error(f"{error.errno} - {error.strerror} - {error.filename}")
-                raise ReadOnlyError(
+            _log_err("%s - %s - %s", error.errno, error.strerror, error.filename)
+            exc_cls = _ERRNO_EXC.get(error.errno)
+            if exc_cls:
+                raise exc_cls(
                     f"{error.errno} - {error.strerror} - {error.filename}"
-                )
+                ) from error
+            raise
 
     @staticmethod
-    def remove_directory(path: pathlib.Path) -> Optional[bool]:
+    def remove_directory(path: PathLike, parallel: bool = False) -> Optional[bool]:
         """
         Remove a directory and all its contents at the specified path.
 
         Args:
             path: The path to the directory to remove.
+            parallel: Unlink the files from a thread pool, which helps on high latency filesystems.
+                Ignored on platforms where PARALLEL_REMOVE_SUPPORTED is False.
 
         Returns:
             True if the directory was removed successfully, False otherwise.
         """
         try:
-            path.rmdir()
+            os.rmdir(path)
             return True
         except OSError as error:
-            if error.errno != errno.ENOTEMPTY:
-                logging.error(f"{error.errno} - {error.strerror} - {error.filename}")
+            if error.errno != _ENOTEMPTY:
+                _log_err("%s - %s - %s", error.errno, error.strerror, error.filename)
                 raise
             else:
-                for child in path.iterdir():
-                    if child.is_file():
-                        child.unlink()
-                    else:
-                        FileHandle.remove_directory(child)
-                path.rmdir()
+                parallel = parallel and PARALLEL_REMOVE_SUPPORTED
+                path = _fspath(path)
+                files = []
+                directories = []
+                for root, dirs, names in os.walk(
+                    path, topdown=False, onerror=_walk_error
+                ):
+                    for name in names:
+                        if parallel:
+                            files.append(os.path.join(root, name))
+                        else:
+                            _unlink(os.path.join(root, name))
+                    for name in dirs:
+                        if parallel:
+                            directories.append(os.path.join(root, name))
+                        else:
+                            _rmdir(os.path.join(root, name))
+                if files:
+                    with ThreadPoolExecutor(max_workers=_REMOVE_WORKERS) as executor:
+                        futures = [executor.submit(_unlink, file) for file in files]
+                        for future in as_completed(futures):
+                            future.result()
+                for directory in directories:
+                    _rmdir(directory)
+                os.rmdir(path)
                 return True
 
     @staticmethod
-    def create_backup(path: pathlib.Path) -> Optional[bool]:
+    def create_backup(path: PathLike) -> pathlib.Path:
         """
         Create a backup of a file at the specified path by copying it to a new file with a .bak extension.
 
@@ -91,18 +719,26 @@ class FileHandle:
             path: The path to the file to create a backup of.
 
         Returns:
-            True if the backup was created successfully, False otherwise.
+            The path to the backup file.
         """
         try:
-            backup_path = path.with_suffix(".bak")
-            FileHandle.copy(path, backup_path)
-            return backup_path
+            path = _fspath(path)
+            root, _ = os.path.splitext(path)
+            backup_path = root + ".bak"
+            if backup_path == path:
+                raise shutil.SameFileError(f"{path!r} is already a backup file")
+            if not _copy_fast(path, backup_path, True):
+                shutil.copy2(path, backup_path)
+            _NEG_CACHE.pop(backup_path, None)
+            return pathlib.Path(backup_path)
         except OSError as error:
-            logging.error(f"{error.errno} - {error.strerror} - {error.filename}")
+            _log_err("%s - %s - %s", error.errno, error.strerror, error.filename)
             raise
 
     @staticmethod
-    def validate_paths(source: pathlib.Path, destination: pathlib.Path) -> None:
+    def validate_paths(
+        source: PathLike, destination: PathLike
+    ) -> Tuple[os.stat_result, os.stat_result]:
         """
         Validate that the source and destination paths are valid for copying a file.
 
@@ -111,95 +747,240 @@ class FileHandle:
             destination: The path to the destination file or directory.
 
         Returns:
-            True if both paths are valid, False otherwise.
+            The stat results of the source and destination paths, so callers don't have to stat them again.
+
+        Raises:
+            SourceNotValidError: If the source path does not exist.
+            DestinationNotValidError: If the destination path does not exist.
         """
-        if not source.exists():
-            raise SourceNotValidError(f"{source} does not exist.")
-        if not destination.exists():
-            raise DestinationNotValidError(f"{destination} does not exist.")
+        source = _fspath(source)
+        destination = _fspath(destination)
+        if _known_missing(source):
+            raise SourceNotValidError(source)
+        try:
+            src_stat = os.stat(source, follow_symlinks=False)
+        except (FileNotFoundError, NotADirectoryError):
+            _remember_missing(source)
+            raise SourceNotValidError(source) from None
+        if _known_missing(destination):
+            raise DestinationNotValidError(destination)
+        try:
+            dst_stat = os.stat(destination, follow_symlinks=False)
+        except (FileNotFoundError, NotADirectoryError):
+            _remember_missing(destination)
+            raise DestinationNotValidError(destination) from None
+        return src_stat, dst_stat
 
     @staticmethod
-    def copy(source: pathlib.Path, destination: pathlib.Path) -> Optional[bool]:
+    def copy(
+        source: PathLike, destination: PathLike, preserve_metadata: bool = False
+    ) -> Optional[bool]:
         """
         Copy a file from the source path to the destination path.
 
         Args:
             source: The path to the source file.
             destination: The path to the destination file.
+            preserve_metadata: Also copy the permission bits and timestamps, like shutil.copy2.
 
         Returns:
             True if the file was copied successfully, False otherwise.
         """
         try:
-            shutil.copy2(source, destination)
+            source = _fspath(source)
+            destination = _fspath(destination)
+            if os.path.isdir(destination):
+                destination = os.path.join(destination, os.path.basename(source))
+            if _copy_fast(source, destination, preserve_metadata):
+                pass
+            elif preserve_metadata:
+                shutil.copy2(source, destination)
+            else:
+                shutil.copyfile(source, destination)
+            _NEG_CACHE.pop(destination, None)
             return True
         except OSError as error:
-            logging.error(f"{error.errno} - {error.strerror} - {error.filename}")
+            _log_err("%s - %s - %s", error.errno, error.strerror, error.filename)
             raise
 
     @staticmethod
     def transfer(
-        source: pathlib.Path, destination: pathlib.Path, copy_func: Callable
+        source: PathLike,
+        destination: PathLike,
+        copy_func: Callable,
+        preserve_metadata: bool = False,
     ) -> None:
         """
         Transfer a file or directory from the source path to the destination path using the specified copy function.
 
+        The destination directory is created up front and the source is only checked by copy_func opening it,
+        so a successful transfer doesn't stat either path beforehand.
+
         Args:
             source: The path to the source file or directory.
             destination: The path to the destination file or directory.
             copy_func: The function to use for copying the file or directory.
+            preserve_metadata: Ask copy_func to copy the permission bits and timestamps too.
+                It is only passed to copy_func when True, so other copy functions keep working.
 
         Raises:
             SourceNotValidError: If the source path is not valid.
             DestinationNotValidError: If the destination path is not valid and cannot be created.
             OSError: If there is an error during the file or directory copy operation.
         """
+        source = _fspath(source)
+        destination = _fspath(destination)
+        _prepare_destination(destination)
+
         try:
-            FileHandle.validate_paths(source, destination)
-        except DestinationNotValidError as error:
-            try:
-                FileHandle.make_directory(destination)
-            except (PermissionDeniedError, ReadOnlyError) as error:
-                raise DestinationNotValidError from error
-        except SourceNotValidError as error:
-            raise SourceNotValidError from error
+            if preserve_metadata:
+                copy_func(source, destination, preserve_metadata=True)
+            else:
+                copy_func(source, destination)
+        except FileNotFoundError as error:
+            if error.filename != source:
+                raise
+            _remember_missing(source)
+            raise SourceNotValidError(source) from error
 
-        copy_func(source, destination)
+    upload = staticmethod(_make_transfer("upload", copy.__func__))
+    download = staticmethod(_make_transfer("download", copy.__func__))
 
     @staticmethod
-    def upload(
-        source: pathlib.Path, destination: pathlib.Path, copy_func: Callable = copy
+    def upload_many(
+        pairs: Sequence[Tuple[PathLike, PathLike]],
+        depth: int = 64,
+        preserve_metadata: bool = False,
     ) -> Optional[bool]:
         """
-        Upload a file or directory from the source path to the destination path.
+        Upload many files, submitting the small ones to io_uring in batches of depth files.
+
+        The result is the same as uploading the pairs one after the other, also when a pair
+        reads a file that an earlier pair writes.
 
         Args:
-            source: The path to the source file or directory.
-            destination: The path to the destination file or directory.
+            pairs: The source and destination path of every upload, as they would be passed to upload.
+            depth: The number of small files copied with a single submit.
+            preserve_metadata: Also copy the permission bits and timestamps.
 
         Raises:
-            SourceNotValidError: If the source path is not valid.
-            DestinationNotValidError: If the destination path is not valid and cannot be created.
-            OSError: If there is an error during the file or directory copy operation.
+            SourceNotValidError: If a source path is not valid.
+            DestinationNotValidError: If a destination path is not valid and cannot be created.
+            OSError: If there is an error during a file or directory copy operation.
         """
-        FileHandle.transfer(source, destination, copy_func)
+        # The ring runs every queued job at once, so a pair that reads a queued target or
+        # writes a queued source or target has to wait until the queue has been flushed.
+        # Paths catch targets that don't exist yet, inodes catch links to the same file.
+        jobs = []
+        reads = set()
+        writes = set()
+
+        def flush() -> None:
+            if not _upload_many_uring(jobs, depth, preserve_metadata):
+                for source, target, _ in jobs:
+                    FileHandle.copy(source, target, preserve_metadata)
+            jobs.clear()
+            reads.clear()
+            writes.clear()
+
+        for source, destination in pairs:
+            source = _fspath(source)
+            destination = _fspath(destination)
+            src_path = os.path.abspath(source)
+            if src_path in writes:
+                flush()
+            try:
+                src_stat = os.stat(source)
+            except FileNotFoundError as error:
+                _remember_missing(source)
+                raise SourceNotValidError(source) from error
+            src_id = (src_stat.st_dev, src_stat.st_ino)
+            if src_id in writes:
+                flush()
+                src_stat = os.stat(source)
+            if (
+                not stat.S_ISREG(src_stat.st_mode)
+                or src_stat.st_size > _UPLOAD_MANY_MAX
+            ):
+                if jobs:
+                    flush()
+                FileHandle.upload(
+                    source, destination, preserve_metadata=preserve_metadata
+                )
+                continue
+            if _prepare_destination(destination):
+                destination = os.path.join(destination, os.path.basename(source))
+            dst_path = os.path.abspath(destination)
+            try:
+                dst_stat = os.stat(destination)
+            except FileNotFoundError:
+                dst_keys = (dst_path,)
+            else:
+                # The ring opens the target with O_TRUNC, so it mustn't be the source itself.
+                if os.path.samestat(src_stat, dst_stat):
+                    raise shutil.SameFileError(
+                        f"{source!r} and {destination!r} are the same file"
+                    )
+                dst_keys = (dst_path, (dst_stat.st_dev, dst_stat.st_ino))
+            if any(key in reads or key in writes for key in dst_keys):
+                flush()
+            jobs.append((source, destination, src_stat))
+            reads.update((src_path, src_id))
+            writes.update(dst_keys)
+
+        if jobs:
+            flush()
         return True
 
     @staticmethod
-    def download(
-        source: pathlib.Path, destination: pathlib.Path, copy_func: Callable = copy
-    ) -> Optional[bool]:
+    def make_copier(
+        src_dir: PathLike, dst_dir: PathLike, preserve_metadata: bool = False
+    ) -> Callable[[str], Optional[bool]]:
         """
-        Download a file or directory from the source path to the destination path.
+        Build a function that copies files by name from one directory to another.
+
+        Both directories are resolved and checked once here, so every call only joins the
+        name onto the two prefixes and copies, which suits sync jobs copying many files.
 
         Args:
-            source: The path to the source file or directory.
-            destination: The path to the destination file or directory.
+            src_dir: The directory to copy files from.
+            dst_dir: The directory to copy files to, created if it doesn't exist.
+            preserve_metadata: Also copy the permission bits and timestamps.
+
+        Returns:
+            A function taking a file name relative to both directories.
 
         Raises:
-            SourceNotValidError: If the source path is not valid.
-            DestinationNotValidError: If the destination path is not valid and cannot be created.
-            OSError: If there is an error during the file or directory copy operation.
+            SourceNotValidError: If the source directory does not exist.
+            DestinationNotValidError: If the destination directory cannot be created
+                or a file is in its place.
         """
-        FileHandle.transfer(source, destination, copy_func)
-        return True
+        src_prefix = os.path.abspath(os.path.expanduser(_fspath(src_dir))) + os.sep
+        dst_prefix = os.path.abspath(os.path.expanduser(_fspath(dst_dir)))
+        if not os.path.isdir(src_prefix):
+            raise SourceNotValidError(src_prefix[:-1])
+        if not _prepare_destination(dst_prefix):
+            raise DestinationNotValidError(dst_prefix)
+        dst_prefix += os.sep
+        copy_fast = _copy_fast
+        neg_cache = _NEG_CACHE
+        log_err = _log_err
+        remember_missing = _remember_missing
+        fallback = shutil.copy2 if preserve_metadata else shutil.copyfile
+
+        def copy_name(name: str) -> Optional[bool]:
+            source = src_prefix + name
+            destination = dst_prefix + name
+            try:
+                if not copy_fast(source, destination, preserve_metadata):
+                    fallback(source, destination)
+            except OSError as error:
+                log_err("%s - %s - %s", error.errno, error.strerror, error.filename)
+                if not isinstance(error, FileNotFoundError) or error.filename != source:
+                    raise
+                remember_missing(source)
+                raise SourceNotValidError(source) from error
+            neg_cache.pop(destination, None)
+            return True
+
+        return copy_name
@@ -0,0 +1,49 @@
+# cython: language_level=3
+"""
+Compiled versions of the FileHandle hot paths.
+
+Build in place with `cythonize -i file_handle_c.pyx`; file_handle uses this module
+when it can be imported and falls back to the pure Python implementation otherwise.
+Errors are raised as plain OSError so file_handle keeps a single errno mapping.
+"""
+import os
+
+from libc.errno cimport errno, EEXIST, ENOENT
+from posix.stat cimport mkdir, stat, struct_stat, S_ISDIR
+
+
+cdef int _raise_oserror(int error, str path) except -1:
+    raise OSError(error, os.strerror(error), path)
+
+
+cdef bint _is_directory(bytes path):
+    cdef struct_stat st
+    return stat(path, &st) == 0 and S_ISDIR(st.st_mode)
+
+
+cpdef int make_directory(str path) except -1:
+    """
+    Create a directory and any missing parents, like os.makedirs(path, exist_ok=True).
+
+    Args:
+        path: The path to the directory to create.
+
+    Raises:
+        OSError: If the directory can't be created.
+    """
+    cdef bytes encoded = os.fsencode(path)
+    cdef int error
+    cdef str parent
+    if mkdir(encoded, 0o777) == 0:
+        return 0
+    error = errno
+    if error == ENOENT:
+        parent = os.path.dirname(path.rstrip(os.sep))
+        if parent and parent != path:
+            make_directory(parent)
+            if mkdir(encoded, 0o777) == 0:
+                return 0
+            error = errno
+    if error == EEXIST and _is_directory(encoded):
+        return 0
+    return _raise_oserror(error, path)
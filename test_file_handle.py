@@ -1,8 +1,21 @@
+import os
+import errno
+import stat
+import shutil
+import inspect
+import time
 import pathlib
 import tempfile
 import pytest
 
-from file_handle import FileHandle, SourceNotValidError, DestinationNotValidError
+import file_handle
+
+from file_handle import (
+    FileHandle,
+    SourceNotValidError,
+    DestinationNotValidError,
+    PermissionDeniedError,
+)
 
 
 class TestFileHandle:
@@ -28,25 +41,188 @@ class TestFileHandle:
         assert FileHandle.make_directory(path)
         assert path.is_dir()
 
+    def test_make_directory_errors(self, monkeypatch):
+        path = pathlib.Path(self.temp_dir.name) / "test_dir"
+
+        def makedirs(name, *args, **kwargs):
+            raise OSError(errno.EACCES, "Permission denied", str(name))
+
+        monkeypatch.setattr(file_handle, "_c", None)
+        monkeypatch.setattr(os, "makedirs", makedirs)
+        with pytest.raises(PermissionDeniedError):
+            FileHandle.make_directory(path)
+        monkeypatch.undo()
+
+        # Test errors without a dedicated exception
+        with pytest.raises(NotADirectoryError):
+            FileHandle.make_directory(self.valid_file_path / "test_dir")
+
+    def test_make_directory_c(self):
+        file_handle_c = pytest.importorskip("file_handle_c")
+        path = pathlib.Path(self.temp_dir.name) / "test_dir" / "test_subdir"
+        assert file_handle_c.make_directory(str(path)) == 0
+        assert path.is_dir()
+        assert file_handle_c.make_directory(str(path)) == 0
+        with pytest.raises(FileExistsError):
+            file_handle_c.make_directory(str(self.valid_file_path))
+
+    def test_error_logging(self, caplog, monkeypatch):
+        monkeypatch.setattr(file_handle.logger, "handlers", [caplog.handler])
+        path = self.valid_file_path / "100%s_dir"
+        with pytest.raises(NotADirectoryError):
+            FileHandle.make_directory(path)
+        assert caplog.records[-1].getMessage().endswith(str(path))
+
     def test_remove_directory(self):
         path = self.valid_dir_path
         assert FileHandle.remove_directory(path)
         assert not path.exists()
 
+    def test_remove_directory_parallel(self):
+        path = self.valid_dir_path
+        for i in range(64):
+            (path / "test_subdir" / f"file_{i}.txt").touch()
+        assert FileHandle.remove_directory(path, parallel=True)
+        assert not path.exists()
+
+    def test_remove_directory_keeps_symlink_targets(self):
+        path = self.valid_dir_path
+        target = pathlib.Path(self.temp_dir.name) / "target_dir"
+        target.mkdir()
+        (target / "kept_file.txt").touch()
+        (path / "test_subdir" / "link").symlink_to(target, target_is_directory=True)
+        assert FileHandle.remove_directory(path)
+        assert not path.exists()
+        assert (target / "kept_file.txt").is_file()
+
     def test_create_backup(self):
         source_path = self.valid_file_path
         backup_path = FileHandle.create_backup(source_path)
         assert backup_path.exists()
         assert backup_path.is_file()
+        assert backup_path == source_path.with_suffix(".bak")
+
+    def test_copy(self):
+        source_path = self.valid_file_path
+        source_path.write_bytes(os.urandom((1 << 20) + 3))
+        destination_path = pathlib.Path(self.temp_dir.name) / "copied_file.txt"
+        assert FileHandle.copy(source_path, destination_path)
+        assert destination_path.read_bytes() == source_path.read_bytes()
+
+        # Test copy into an existing directory
+        assert FileHandle.copy(source_path, self.valid_dir_path)
+        assert (self.valid_dir_path / source_path.name).is_file()
+
+    def test_copy_same_file(self):
+        source_path = self.valid_file_path
+        source_path.write_text("test")
+        with pytest.raises(shutil.SameFileError):
+            FileHandle.copy(source_path, source_path)
+        with pytest.raises(shutil.SameFileError):
+            FileHandle.upload(source_path, source_path.parent)
+        assert source_path.read_text() == "test"
+
+    def test_copy_special_file(self):
+        source_path = pathlib.Path(self.temp_dir.name) / "fifo"
+        os.mkfifo(source_path)
+        destination_path = pathlib.Path(self.temp_dir.name) / "copied_file.txt"
+        with pytest.raises(shutil.SpecialFileError):
+            FileHandle.copy(source_path, destination_path)
+
+    def test_copy_to_special_file(self):
+        self.valid_file_path.write_text("test")
+        destination_path = pathlib.Path(self.temp_dir.name) / "fifo"
+        os.mkfifo(destination_path)
+        with pytest.raises(shutil.SpecialFileError):
+            FileHandle.copy(self.valid_file_path, destination_path)
+
+        # Test a FIFO with a reader attached
+        reader = os.open(destination_path, os.O_RDONLY | os.O_NONBLOCK)
+        try:
+            with pytest.raises(shutil.SpecialFileError):
+                FileHandle.copy(self.valid_file_path, destination_path)
+        finally:
+            os.close(reader)
+
+    def test_copy_preserve_metadata(self):
+        source_path = self.valid_file_path
+        source_path.write_text("test")
+        os.utime(source_path, (0, 0))
+        destination_path = pathlib.Path(self.temp_dir.name) / "copied_file.txt"
+        assert FileHandle.copy(source_path, destination_path)
+        assert destination_path.stat().st_mtime != 0
+
+        assert FileHandle.copy(source_path, destination_path, preserve_metadata=True)
+        assert destination_path.stat().st_mtime == 0
+
+    def test_copy_sendfile_fallback(self, monkeypatch):
+        monkeypatch.setattr(file_handle, "liburing", None)
+        monkeypatch.delattr(os, "copy_file_range", raising=False)
+        source_path = self.valid_file_path
+        source_path.write_bytes(os.urandom(1 << 20))
+        destination_path = pathlib.Path(self.temp_dir.name) / "copied_file.txt"
+        assert FileHandle.copy(source_path, destination_path)
+        assert destination_path.read_bytes() == source_path.read_bytes()
+
+    def test_str_paths(self):
+        path = os.path.join(self.temp_dir.name, "test_dir")
+        assert FileHandle.make_directory(path)
+        assert FileHandle.upload(str(self.valid_file_path), path)
+        assert os.path.isfile(os.path.join(path, self.valid_file_path.name))
+        assert FileHandle.create_backup(str(self.valid_file_path)).is_file()
+        assert FileHandle.remove_directory(path)
+        assert not os.path.exists(path)
+
+    def test_copy_direct(self, monkeypatch):
+        monkeypatch.setattr(file_handle, "_DIRECT_THRESHOLD", 0)
+        monkeypatch.setattr(file_handle, "_DIRECT_CHUNK", 1 << 16)
+        source_path = self.valid_file_path
+        source_path.write_bytes(os.urandom((1 << 18) + 3))
+        destination_path = pathlib.Path(self.temp_dir.name) / "copied_file.txt"
+        assert FileHandle.copy(source_path, destination_path)
+        assert destination_path.read_bytes() == source_path.read_bytes()
+
+        # Test a short read before the end of the file
+        preadv = os.preadv
+        reads = []
+
+        def short_preadv(fd, buffers, offset):
+            length = preadv(fd, buffers, offset)
+            reads.append(offset)
+            return 1000 if len(reads) == 1 else length
+
+        monkeypatch.setattr(os, "preadv", short_preadv)
+        destination_path.unlink()
+        assert FileHandle.copy(source_path, destination_path)
+        assert reads[1] == 1000
+        assert destination_path.read_bytes() == source_path.read_bytes()
+
+    def test_create_backup_negative_cache(self):
+        backup_path = self.valid_file_path.with_suffix(".bak")
+        with pytest.raises(DestinationNotValidError):
+            FileHandle.validate_paths(self.valid_file_path, backup_path)
+        assert FileHandle.create_backup(self.valid_file_path) == backup_path
+        FileHandle.validate_paths(self.valid_file_path, backup_path)
+
+    def test_create_backup_of_backup(self):
+        source_path = pathlib.Path(self.temp_dir.name) / "valid_file.bak"
+        source_path.write_text("test")
+        with pytest.raises(shutil.SameFileError):
+            FileHandle.create_backup(source_path)
+        assert source_path.read_text() == "test"
 
     def test_validate_paths(self):
         # Test valid paths
-        assert (
-            FileHandle.validate_paths(self.valid_file_path, self.valid_dir_path) is None
+        src_stat, dst_stat = FileHandle.validate_paths(
+            self.valid_file_path, self.valid_dir_path
         )
-        assert (
-            FileHandle.validate_paths(self.valid_dir_path, self.valid_file_path) is None
+        assert stat.S_ISREG(src_stat.st_mode)
+        assert stat.S_ISDIR(dst_stat.st_mode)
+        src_stat, dst_stat = FileHandle.validate_paths(
+            self.valid_dir_path, self.valid_file_path
         )
+        assert stat.S_ISDIR(src_stat.st_mode)
+        assert stat.S_ISREG(dst_stat.st_mode)
 
         # Test invalid source paths
         with pytest.raises(SourceNotValidError):
@@ -56,10 +232,44 @@ class TestFileHandle:
         with pytest.raises(DestinationNotValidError):
             FileHandle.validate_paths(self.valid_file_path, self.invalid_dir_path)
 
+        # Test paths below a regular file
+        with pytest.raises(SourceNotValidError):
+            FileHandle.validate_paths(self.valid_file_path / "sub", self.valid_dir_path)
+        with pytest.raises(DestinationNotValidError):
+            FileHandle.validate_paths(
+                self.valid_file_path, self.valid_file_path / "sub"
+            )
+
+        # Test the message is built from the path on demand
+        file_handle._NEG_CACHE.clear()
+        with pytest.raises(DestinationNotValidError) as excinfo:
+            FileHandle.validate_paths(self.valid_file_path, self.invalid_dir_path)
+        assert excinfo.value.path == str(self.invalid_dir_path)
+        assert str(excinfo.value) == f"{self.invalid_dir_path} does not exist."
+        assert excinfo.value.__suppress_context__
+
         # Test invalid source and destination paths
         with pytest.raises(SourceNotValidError):
             FileHandle.validate_paths(self.invalid_file_path, self.invalid_dir_path)
 
+    def test_validate_paths_negative_cache(self):
+        with pytest.raises(SourceNotValidError):
+            FileHandle.validate_paths(self.invalid_file_path, self.valid_dir_path)
+
+        # A path created behind the module's back stays missing until the entry expires
+        self.invalid_file_path.touch()
+        with pytest.raises(SourceNotValidError):
+            FileHandle.validate_paths(self.invalid_file_path, self.valid_dir_path)
+        file_handle._NEG_CACHE[str(self.invalid_file_path)] = time.monotonic()
+        assert FileHandle.validate_paths(self.invalid_file_path, self.valid_dir_path)
+
+        # Paths created through FileHandle are evicted right away
+        path = pathlib.Path(self.temp_dir.name) / "test_dir"
+        with pytest.raises(DestinationNotValidError):
+            FileHandle.validate_paths(self.valid_file_path, path)
+        FileHandle.make_directory(path)
+        assert FileHandle.validate_paths(self.valid_file_path, path)
+
     def test_upload(self):
         source_path = self.valid_file_path
         destination_path = pathlib.Path(self.temp_dir.name) / "test_dir"
@@ -69,6 +279,147 @@ class TestFileHandle:
         with pytest.raises(SourceNotValidError):
             FileHandle.upload(self.invalid_file_path, destination_path)
 
+    def test_upload_copy_func(self):
+        copied = []
+        destination_path = pathlib.Path(self.temp_dir.name) / "test_dir"
+        assert FileHandle.upload(
+            self.valid_file_path,
+            destination_path,
+            copy_func=lambda source, destination: copied.append((source, destination)),
+        )
+        assert copied == [(str(self.valid_file_path), str(destination_path))]
+
+    def test_transfer(self):
+        copied = []
+        destination_path = pathlib.Path(self.temp_dir.name) / "test_dir"
+        FileHandle.transfer(
+            self.valid_file_path,
+            destination_path,
+            lambda source, destination: copied.append((source, destination)),
+        )
+        assert copied == [(str(self.valid_file_path), str(destination_path))]
+        parameter = inspect.signature(FileHandle.transfer).parameters["copy_func"]
+        assert parameter.default is inspect.Parameter.empty
+        assert FileHandle.upload.__name__ == "upload"
+        with pytest.raises(TypeError):
+            FileHandle.transfer(self.valid_file_path, destination_path)
+        with pytest.raises(SourceNotValidError):
+            FileHandle.transfer(
+                self.invalid_file_path, destination_path, FileHandle.copy
+            )
+
+    def test_upload_destination_errors(self, monkeypatch):
+        def makedirs(name, *args, **kwargs):
+            raise OSError(errno.EACCES, "Permission denied", str(name))
+
+        monkeypatch.setattr(os, "makedirs", makedirs)
+        destination_path = pathlib.Path(self.temp_dir.name) / "test_dir"
+        with pytest.raises(DestinationNotValidError) as excinfo:
+            FileHandle.upload(self.valid_file_path, destination_path)
+        assert excinfo.value.path == str(destination_path)
+        assert excinfo.value.__cause__.errno == errno.EACCES
+        monkeypatch.undo()
+
+        # Test a destination below a regular file
+        with pytest.raises(DestinationNotValidError):
+            FileHandle.upload(self.valid_file_path, self.valid_file_path / "sub")
+
+    def test_upload_to_existing_file(self):
+        source_path = self.valid_file_path
+        source_path.write_text("new")
+        destination_path = pathlib.Path(self.temp_dir.name) / "existing_file.txt"
+        destination_path.write_text("old")
+        assert FileHandle.upload(source_path, destination_path)
+        assert destination_path.read_text() == "new"
+
+    def test_upload_many(self):
+        sources = [self.valid_file_path]
+        for i in range(10):
+            source_path = pathlib.Path(self.temp_dir.name) / f"file_{i}.txt"
+            source_path.write_bytes(os.urandom(i * 1000))
+            sources.append(source_path)
+        large_path = pathlib.Path(self.temp_dir.name) / "large_file.txt"
+        large_path.write_bytes(os.urandom(1 << 20))
+        sources.append(large_path)
+        destination_path = pathlib.Path(self.temp_dir.name) / "test_dir"
+        pairs = [(source, destination_path) for source in sources]
+        assert FileHandle.upload_many(pairs, depth=4, preserve_metadata=True)
+        for source in sources:
+            copied_path = destination_path / source.name
+            assert copied_path.read_bytes() == source.read_bytes()
+            assert copied_path.stat().st_mtime == source.stat().st_mtime
+
+        # Test invalid source path
+        with pytest.raises(SourceNotValidError):
+            FileHandle.upload_many([(self.invalid_file_path, destination_path)])
+
+    def test_upload_many_same_file(self):
+        source_path = self.valid_file_path
+        source_path.write_text("test")
+        with pytest.raises(shutil.SameFileError):
+            FileHandle.upload_many([(source_path, source_path.parent)])
+        assert source_path.read_text() == "test"
+
+    def test_upload_many_chained(self):
+        paths = [pathlib.Path(self.temp_dir.name) / name for name in "abcd"]
+        for i, path in enumerate(paths):
+            path.write_bytes(bytes([i]) * (i + 1) * 1000)
+        expected = paths[0].read_bytes()
+        destination_path = pathlib.Path(self.temp_dir.name) / "test_dir"
+        pairs = [(paths[0], paths[1]), (paths[1], paths[2])]
+        # Test a target that doesn't exist before the upload
+        pairs += [(paths[2], destination_path), (destination_path / "c", paths[3])]
+        assert FileHandle.upload_many(pairs)
+        for path in paths[1:] + [destination_path / "c"]:
+            assert path.read_bytes() == expected
+
+    def test_upload_many_fallback(self, monkeypatch):
+        monkeypatch.setattr(file_handle, "liburing", None)
+        destination_path = pathlib.Path(self.temp_dir.name) / "test_dir"
+        assert FileHandle.upload_many([(self.valid_file_path, destination_path)])
+        assert (destination_path / self.valid_file_path.name).is_file()
+
+    def test_upload_many_unsupported_kernel(self, monkeypatch):
+        liburing = pytest.importorskip("liburing")
+
+        def register_files_sparse(ring, count):
+            raise OSError(errno.EINVAL, "Invalid argument")
+
+        monkeypatch.setattr(
+            liburing, "io_uring_register_files_sparse", register_files_sparse
+        )
+        destination_path = pathlib.Path(self.temp_dir.name) / "test_dir"
+        assert FileHandle.upload_many([(self.valid_file_path, destination_path)])
+        assert (destination_path / self.valid_file_path.name).is_file()
+
+    def test_upload_many_negative_cache(self):
+        destination_path = pathlib.Path(self.temp_dir.name) / "test_dir"
+        copied_path = destination_path / self.valid_file_path.name
+        with pytest.raises(DestinationNotValidError):
+            FileHandle.validate_paths(self.valid_file_path, copied_path)
+        assert FileHandle.upload_many([(self.valid_file_path, destination_path)])
+        FileHandle.validate_paths(self.valid_file_path, copied_path)
+
+    def test_make_copier(self, caplog, monkeypatch):
+        monkeypatch.setattr(file_handle.logger, "handlers", [caplog.handler])
+        destination_path = pathlib.Path(self.temp_dir.name) / "test_dir"
+        copy_name = FileHandle.make_copier(self.valid_dir_path, destination_path)
+        (self.valid_dir_path / "test_file.txt").write_text("test")
+        assert copy_name("test_file.txt")
+        assert (destination_path / "test_file.txt").read_text() == "test"
+
+        # Test invalid source paths
+        with pytest.raises(SourceNotValidError) as excinfo:
+            copy_name("invalid_file.txt")
+        assert excinfo.value.path in file_handle._NEG_CACHE
+        assert caplog.records[-1].getMessage().endswith(excinfo.value.path)
+        with pytest.raises(SourceNotValidError):
+            FileHandle.make_copier(self.invalid_dir_path, destination_path)
+
+        # Test a regular file in place of the destination directory
+        with pytest.raises(DestinationNotValidError):
+            FileHandle.make_copier(self.valid_dir_path, self.valid_file_path)
+
     def test_download(self):
         source_path = self.valid_file_path
         destination_path = pathlib.Path(self.temp_dir.name) / "test_dir"